@@ -2,14 +2,29 @@ import os
 import sys
 import json
 import math
+import hashlib
 import logging
-import threading
 import subprocess
+import threading
 import time
 import signal
 import shutil
+from collections import deque
 from pathlib import Path
-from flask import Flask, jsonify, send_from_directory
+
+import numpy as np
+import orjson
+from flask import Flask, request, send_from_directory
+
+try:
+    from sklearn.neighbors import BallTree  # optional: falls back to the grid index
+except ImportError:
+    BallTree = None
+
+try:
+    import fast_kernels  # numba-compiled haversine kernels (optional)
+except ImportError:
+    fast_kernels = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("lightning-orchestrator")
@@ -18,15 +33,12 @@ REPO_ROOT = Path(__file__).resolve().parent.parent
 FRONTEND_DIR = REPO_ROOT / "frontend"
 FRONTEND_BUILD = FRONTEND_DIR / "build"
 FRONTEND_PUBLIC = FRONTEND_DIR / "public"
-COLLECTOR_SCRIPT = Path(__file__).resolve().parent / "blitzortung_parser.py"
-COLLECTOR_JSON = REPO_ROOT / "backend" / "lightning_messages_decoded.json"
-# The collector writes lightning_messages_decoded.json in its cwd; ensure the path used matches the collector's file
-# The collector's default is "lightning_messages_decoded.json" in its working directory; we'll run it with cwd=backend/
+COLLECTOR_JSON = REPO_ROOT / "backend" / "lightning_messages.jsonl"
+# The collector writes lightning_messages.jsonl in its cwd; ensure the path used matches the collector's file
+# The collector's default is "lightning_messages.jsonl" in its working directory; we'll run it with cwd=backend/
 
-# Supervisor control
-shutdown_event = threading.Event()
-collector_proc_lock = threading.Lock()
-collector_proc = None  # subprocess.Popen
+# Supervisor control (the supervisor itself runs out-of-process; see supervisor.py)
+supervisor_proc = None  # subprocess.Popen
 
 app = Flask(
     __name__,
@@ -38,103 +50,222 @@ app = Flask(
 # ---------------------------
 # Algorithms (same as before)
 # ---------------------------
+EARTH_RADIUS_KM = 6371.0
+
+
+def _a_threshold(radius_km):
+    """Haversine 'a' value equivalent to radius_km.
+
+    arcsin and sqrt are monotonic, so d <= r iff a <= sin(r / 2R)^2; radius
+    checks can compare raw 'a' terms and skip both transcendentals.
+    """
+    return math.sin(radius_km / (2.0 * EARTH_RADIUS_KM)) ** 2
+
+
 class CMPSC463Algorithms:
-    def haversine_distance(self, lat1, lon1, lat2, lon2):
-        R = 6371.0  # Earth radius in km
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
-        return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-    def bfs_connected_components(self, strikes, max_distance_km=50):
-        if not strikes:
+    def build_balltree(self, strikes):
+        """Build a BallTree over strike coordinates (radians) for radius queries.
+
+        BallTree supports the haversine metric directly (KDTree does not),
+        so 50 km neighbor lookups are O(log n) instead of a scan over all strikes.
+        """
+        pts = np.column_stack((strikes['lat_r'], strikes['lon_r']))
+        return pts, BallTree(pts, metric='haversine')
+
+    def _build_neighborhood(self, strikes):
+        """Build the shared spatial structure all three algorithms query.
+
+        Returns {'pts': radians array, 'tree': BallTree or None,
+        'grids': per-radius uniform grids, 'dist_matrix': None}. The dense
+        matrix is left unmaterialized; radius and k-NN queries go through
+        the tree (or the grid fallback when sklearn is not installed) so
+        large strike counts stay O(n log n) in memory.
+        """
+        if strikes['n'] == 0:
+            return {'pts': None, 'tree': None, 'grids': {}, 'dist_matrix': None}
+        if BallTree is not None:
+            pts, tree = self.build_balltree(strikes)
+        else:
+            pts = np.column_stack((strikes['lat_r'], strikes['lon_r']))
+            tree = None
+        return {'pts': pts, 'tree': tree, 'grids': {}, 'dist_matrix': None}
+
+    def _grid_for(self, strikes, nbhd, radius_km):
+        """Uniform lat/lon bucket grid with cell size ~= radius, built lazily
+        per radius. Neighbor candidates for a point are then just the
+        surrounding cells instead of all n strikes."""
+        grid = nbhd['grids'].get(radius_km)
+        if grid is None:
+            cell_deg = radius_km / 111.0  # ~111 km per degree of latitude
+            grid = {}
+            lat, lon = strikes['lat'], strikes['lon']
+            for i in range(strikes['n']):
+                key = (int(lat[i] // cell_deg), int(lon[i] // cell_deg))
+                grid.setdefault(key, []).append(i)
+            nbhd['grids'][radius_km] = grid
+        return grid
+
+    def _grid_radius_query(self, strikes, nbhd, i, radius_km):
+        """Indices and distances of strikes within radius_km of strike i."""
+        grid = self._grid_for(strikes, nbhd, radius_km)
+        cell_deg = radius_km / 111.0
+        ci = int(strikes['lat'][i] // cell_deg)
+        cj = int(strikes['lon'][i] // cell_deg)
+        # Longitude cells shrink towards the poles, so widen the scan there.
+        # The span is ceil(1 / cos) cells, taken at the worst-case latitude
+        # of the three rows scanned so high-latitude neighbors are never
+        # dropped; near the pole the radius wraps every cell in the row.
+        band_lat = min(abs(float(strikes['lat'][i])) + cell_deg, 90.0)
+        cos_min = math.cos(math.radians(band_lat))
+        candidates = []
+        if cos_min * 180.0 <= cell_deg:
+            # polar band: scan all longitude cells in the three rows
+            for (gi, gj), members in grid.items():
+                if ci - 1 <= gi <= ci + 1:
+                    candidates.extend(members)
+        else:
+            lon_span = math.ceil(1.0 / cos_min)
+            for di in (-1, 0, 1):
+                for dj in range(-lon_span, lon_span + 1):
+                    candidates.extend(grid.get((ci + di, cj + dj), ()))
+        idx = np.asarray(candidates, dtype=np.int64)
+        dlat = strikes['lat_r'][idx] - strikes['lat_r'][i]
+        dlon = strikes['lon_r'][idx] - strikes['lon_r'][i]
+        a = np.sin(dlat / 2) ** 2 + strikes['cos_lat'][i] * strikes['cos_lat'][idx] * np.sin(dlon / 2) ** 2
+        # threshold in 'a' space; only kept candidates pay the arcsin/sqrt
+        keep = a <= _a_threshold(radius_km)
+        idx = idx[keep]
+        return idx, 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a[keep]))
+
+    def bfs_connected_components(self, strikes, max_distance_km=50, nbhd=None):
+        """Connected strike regions as lists of indices into the strike arrays."""
+        n = strikes['n']
+        if n == 0:
             return []
+        if nbhd is None:
+            nbhd = self._build_neighborhood(strikes)
+        pts, tree = nbhd['pts'], nbhd['tree']
+        if fast_kernels is not None:
+            indptr, indices = fast_kernels.haversine_neighbors(pts[:, 0], pts[:, 1], max_distance_km)
+            neighbors = [indices[indptr[i]:indptr[i + 1]] for i in range(n)]
+        elif tree is not None:
+            neighbors = tree.query_radius(pts, r=max_distance_km / EARTH_RADIUS_KM)
+        else:
+            neighbors = [self._grid_radius_query(strikes, nbhd, i, max_distance_km)[0] for i in range(n)]
         visited = set()
         components = []
-        for i in range(len(strikes)):
+        for i in range(n):
             if i not in visited:
                 component = []
-                queue = [i]
+                queue = deque([i])
                 visited.add(i)
                 while queue:
-                    current_idx = queue.pop(0)
-                    component.append(strikes[current_idx])
-                    current = strikes[current_idx]
-                    for j in range(len(strikes)):
+                    current_idx = queue.popleft()
+                    component.append(current_idx)
+                    for j in neighbors[current_idx]:
+                        j = int(j)
                         if j not in visited:
-                            dist = self.haversine_distance(current['lat'], current['lon'], strikes[j]['lat'], strikes[j]['lon'])
-                            if dist <= max_distance_km:
-                                visited.add(j)
-                                queue.append(j)
+                            visited.add(j)
+                            queue.append(j)
                 if len(component) > 1:
                     components.append(component)
         return components
 
-    def _calculate_local_density(self, strike, all_strikes, radius_km=50):
-        count = 0
-        for other in all_strikes:
-            if self.haversine_distance(strike['lat'], strike['lon'], other['lat'], other['lon']) <= radius_km:
-                count += 1
-        return count
-
-    def greedy_hotspot_selection(self, strikes, k=10):
-        if len(strikes) <= k:
-            return strikes
-        weighted = []
-        for s in strikes:
-            w = self._calculate_local_density(s, strikes)
-            weighted.append((w, s))
-        weighted.sort(reverse=True, key=lambda x: x[0])
-        return [s for _, s in weighted[:k]]
-
-    def prim_mst_clusters(self, strikes, max_edge_km=100):
-        if len(strikes) <= 1:
+    def _calculate_local_density(self, strikes, radius_km=50, nbhd=None):
+        """Per-strike neighbor counts within radius_km, as one bulk tree query."""
+        if nbhd is None:
+            nbhd = self._build_neighborhood(strikes)
+        pts = nbhd['pts']
+        if fast_kernels is not None:
+            return fast_kernels.density_counts(pts[:, 0], pts[:, 1], radius_km)
+        if nbhd['tree'] is not None:
+            return nbhd['tree'].query_radius(pts, r=radius_km / EARTH_RADIUS_KM, count_only=True)
+        return np.array([len(self._grid_radius_query(strikes, nbhd, i, radius_km)[0])
+                         for i in range(strikes['n'])])
+
+    def greedy_hotspot_selection(self, strikes, k=10, nbhd=None):
+        """Indices of the k densest strikes, densest first."""
+        n = strikes['n']
+        if n <= k:
+            return list(range(n))
+        density = self._calculate_local_density(strikes, nbhd=nbhd)
+        # argpartition gives the k densest strikes in O(n) without a full sort
+        top = np.argpartition(density, -k)[-k:]
+        top = top[np.argsort(density[top])[::-1]]
+        return [int(i) for i in top]
+
+    def kruskal_mst_clusters(self, strikes, max_edge_km=100, nbhd=None):
+        """MST clustering via Kruskal + union-find on a k-NN sparse graph.
+
+        Edges longer than max_edge_km get discarded afterwards anyway, so
+        only the MST of a k-nearest-neighbor graph is needed. That avoids
+        the dense n x n distance matrix and the O(n^3) Prim scan entirely.
+        Clusters hold member indices into the strike arrays.
+        """
+        n = strikes['n']
+        if n <= 1:
             return []
-        n = len(strikes)
-        dist_matrix = [[0.0] * n for _ in range(n)]
-        for i in range(n):
-            for j in range(i + 1, n):
-                d = self.haversine_distance(strikes[i]['lat'], strikes[i]['lon'], strikes[j]['lat'], strikes[j]['lon'])
-                dist_matrix[i][j] = dist_matrix[j][i] = d
-        visited = set([0])
-        mst_edges = []
-        while len(visited) < n:
-            min_edge = (float('inf'), -1, -1)
-            for u in list(visited):
-                for v in range(n):
-                    if v not in visited and dist_matrix[u][v] > 0 and dist_matrix[u][v] < min_edge[0]:
-                        min_edge = (dist_matrix[u][v], u, v)
-            if min_edge[1] != -1:
-                mst_edges.append(min_edge)
-                visited.add(min_edge[2])
-            else:
+        if nbhd is None:
+            nbhd = self._build_neighborhood(strikes)
+        pts, tree = nbhd['pts'], nbhd['tree']
+        edges = []
+        if tree is not None:
+            k = min(16, n)
+            dists, idxs = tree.query(pts, k=k)
+            dists = dists * EARTH_RADIUS_KM
+            for i in range(n):
+                for d, j in zip(dists[i], idxs[i]):
+                    j = int(j)
+                    if j != i:
+                        edges.append((float(d), i, j))
+        else:
+            # grid fallback: all pairs within max_edge_km already contain
+            # every edge the clustering can keep
+            for i in range(n):
+                idx, d = self._grid_radius_query(strikes, nbhd, i, max_edge_km)
+                for jj, dd in zip(idx, d):
+                    j = int(jj)
+                    if j != i:
+                        edges.append((float(dd), i, j))
+        edges.sort()
+
+        # union-find with path compression + union by rank
+        parent = list(range(n))
+        rank = [0] * n
+
+        def find(x):
+            root = x
+            while parent[root] != root:
+                root = parent[root]
+            while parent[x] != root:
+                parent[x], x = root, parent[x]
+            return root
+
+        for d, u, v in edges:
+            if d > max_edge_km:
                 break
-        # remove long edges
-        short_edges = [e for e in mst_edges if e[0] <= max_edge_km]
-        # adjacency
-        adj = {i: set() for i in range(n)}
-        for dist, u, v in short_edges:
-            adj[u].add(v)
-            adj[v].add(u)
-        clusters = []
-        seen = set()
+            ru, rv = find(u), find(v)
+            if ru != rv:
+                if rank[ru] < rank[rv]:
+                    ru, rv = rv, ru
+                parent[rv] = ru
+                if rank[ru] == rank[rv]:
+                    rank[ru] += 1
+
+        groups = {}
         for i in range(n):
-            if i in seen:
-                continue
-            stack = [i]
-            comp = []
-            seen.add(i)
-            while stack:
-                node = stack.pop()
-                comp.append(strikes[node])
-                for nb in adj.get(node, ()):
-                    if nb not in seen:
-                        seen.add(nb)
-                        stack.append(nb)
-            if len(comp) > 1:
-                avg_lat = sum(s['lat'] for s in comp) / len(comp)
-                avg_lon = sum(s['lon'] for s in comp) / len(comp)
-                clusters.append({'center': {'lat': avg_lat, 'lon': avg_lon}, 'count': len(comp), 'strikes': comp})
+            groups.setdefault(find(i), []).append(i)
+        clusters = []
+        for members in groups.values():
+            if len(members) > 1:
+                clusters.append({
+                    'center': {
+                        'lat': float(np.mean(strikes['lat'][members])),
+                        'lon': float(np.mean(strikes['lon'][members])),
+                    },
+                    'count': len(members),
+                    'members': members,
+                })
         return clusters
 
 
@@ -143,75 +274,16 @@ class CMPSC463Algorithms:
 # ---------------------------
 def start_collector_supervisor():
     """
-    Starts a background thread that ensures the collector subprocess is running.
-    If it exits unexpectedly, the supervisor restarts it after a short delay.
+    Spawns supervisor.py as its own OS process. It keeps the collector
+    subprocess running and restarts it on unexpected exit; doing that
+    out-of-process means its blocking stdout tailing and restart loop
+    never contend for this server's GIL.
     """
-    def supervisor():
-        global collector_proc
-        backend_dir = Path(__file__).resolve().parent
-        cmd = [sys.executable, str(COLLECTOR_SCRIPT.name)]
-        env = os.environ.copy()
-        # Pass headless env variable into collector
-        env_headless = os.getenv("PLAYWRIGHT_HEADLESS", "1")
-        env["PLAYWRIGHT_HEADLESS"] = env_headless
-
-        while not shutdown_event.is_set():
-            with collector_proc_lock:
-                if collector_proc is None or collector_proc.poll() is not None:
-                    logger.info("Starting collector subprocess...")
-                    try:
-                        # Run collector with cwd=backend_dir so its output file will be created there
-                        collector_proc = subprocess.Popen(
-                            cmd,
-                            cwd=str(backend_dir),
-                            env=env,
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.STDOUT,
-                            text=True,
-                        )
-                        logger.info(f"Collector started (pid={collector_proc.pid})")
-                    except Exception as e:
-                        logger.exception("Failed to start collector:")
-                        collector_proc = None
-
-            # tail the collector stdout while it's running
-            if collector_proc:
-                try:
-                    while collector_proc.poll() is None and not shutdown_event.is_set():
-                        # read a line with timeout-like behavior
-                        line = collector_proc.stdout.readline()
-                        if line:
-                            print(f"[collector] {line.rstrip()}")
-                        else:
-                            # Avoid busy loop if no output
-                            time.sleep(0.2)
-                    # if we get here, collector exited or shutdown_event set
-                    rc = collector_proc.poll()
-                    logger.warning(f"Collector process exited (rc={rc})")
-                except Exception:
-                    logger.exception("Error while monitoring collector stdout")
-            # if not shutting down - restart after brief sleep
-            if not shutdown_event.is_set():
-                logger.info("Restarting collector in 2s...")
-                time.sleep(2)
-
-        # Shutdown requested: ensure collector is terminated
-        with collector_proc_lock:
-            if collector_proc and collector_proc.poll() is None:
-                logger.info("Terminating collector subprocess...")
-                collector_proc.terminate()
-                try:
-                    collector_proc.wait(timeout=5)
-                except Exception:
-                    try:
-                        collector_proc.kill()
-                    except Exception:
-                        pass
-        logger.info("Collector supervisor exiting.")
-
-    t = threading.Thread(target=supervisor, daemon=True)
-    t.start()
-    return t
+    global supervisor_proc
+    backend_dir = Path(__file__).resolve().parent
+    supervisor_proc = subprocess.Popen([sys.executable, str(backend_dir / "supervisor.py")])
+    logger.info(f"Collector supervisor started (pid={supervisor_proc.pid})")
+    return supervisor_proc
 
 
 # ---------------------------
@@ -258,99 +330,286 @@ def ensure_frontend_built():
 # ---------------------------
 # Utilities: read strikes
 # ---------------------------
-def read_strikes_from_collector(filename=COLLECTOR_JSON, limit=500):
+def _make_strikes(lats, lons, intensities):
+    """Pack strike columns, precomputing the radian/cos-lat columns the
+    distance code needs so they are derived once per ingestion, not per use."""
+    lat = np.asarray(lats, dtype=np.float64)
+    lon = np.asarray(lons, dtype=np.float64)
+    lat_r = np.radians(lat)
+    return {
+        "lat": lat,
+        "lon": lon,
+        "lat_r": lat_r,
+        "lon_r": np.radians(lon),
+        "cos_lat": np.cos(lat_r),
+        "intensity": np.asarray(intensities, dtype=np.float32),
+        "n": len(lat),
+    }
+
+
+def _empty_strikes():
+    return _make_strikes([], [], [])
+
+
+def _strike_from_entry(entry):
+    """Extract a (lat, lon, intensity) tuple from one collector entry, or None."""
+    parsed = entry.get("decoded") or {}
+    candidate = None
+    if parsed.get("success"):
+        rawp = parsed.get("raw") or {}
+        decp = parsed.get("decoded") or {}
+        for container in (rawp, decp):
+            if isinstance(container, dict):
+                if "data" in container and isinstance(container["data"], dict):
+                    maybe = container["data"]
+                    if "lat" in maybe and "lon" in maybe:
+                        candidate = maybe
+                        break
+                if "lat" in container and "lon" in container:
+                    candidate = container
+                    break
+    if candidate is None:
+        rm = entry.get("raw_message", "")
+        try:
+            pm = json.loads(rm)
+            if isinstance(pm, dict):
+                if "data" in pm and isinstance(pm["data"], dict) and "lat" in pm["data"]:
+                    candidate = pm["data"]
+                elif "lat" in pm and "lon" in pm:
+                    candidate = pm
+        except Exception:
+            pass
+    if candidate and "lat" in candidate and "lon" in candidate:
+        try:
+            return (
+                float(candidate["lat"]),
+                float(candidate["lon"]),
+                float(candidate.get("mcg", candidate.get("intensity", 1))),
+            )
+        except Exception:
+            return None
+    return None
+
+
+# Tail state for the collector NDJSON log: remembered offset plus a rolling
+# window of parsed strikes, so each API call only parses lines appended
+# since the previous one.
+STRIKE_WINDOW = 500
+_tail_state = {
+    "offset": 0,
+    "pending": "",
+    "buffer": deque(maxlen=STRIKE_WINDOW),
+}
+
+
+def _reset_tail_state():
+    _tail_state["offset"] = 0
+    _tail_state["pending"] = ""
+    _tail_state["buffer"].clear()
+
+
+def read_strikes_from_collector(filename=COLLECTOR_JSON, limit=STRIKE_WINDOW):
     """
-    Robust parser for the collector JSON produced by blitzortung_parser.BlitzortungRawCollector.
-    Returns list of {'lat': float, 'lon': float, 'intensity': float}
+    Incremental reader for the NDJSON log produced by
+    blitzortung_parser.BlitzortungRawCollector: one entry per line, parsed
+    with orjson. Only bytes appended since the previous call are read;
+    parsed strikes accumulate in a rolling window. Returns a
+    structure-of-arrays dict {'lat', 'lon', 'intensity', 'n'} with
+    contiguous NumPy columns.
     """
     if not filename.exists():
-        return []
+        _reset_tail_state()
+        return _empty_strikes()
     try:
-        raw = filename.read_text(encoding="utf-8").strip()
-        if not raw:
-            return []
-        # tolerate missing closing bracket
-        if raw.startswith("[") and not raw.endswith("]"):
-            raw = raw + "]"
-        data = json.loads(raw)
+        size = filename.stat().st_size
+        if size < _tail_state["offset"]:
+            # collector restarted and truncated the file
+            _reset_tail_state()
+        if size > _tail_state["offset"]:
+            with open(filename, "r", encoding="utf-8") as f:
+                f.seek(_tail_state["offset"])
+                chunk = _tail_state["pending"] + f.read()
+                _tail_state["offset"] = f.tell()
+            lines = chunk.split("\n")
+            # last element is a partial line (or empty); finish it next call
+            _tail_state["pending"] = lines.pop()
+            for line in lines:
+                if not line:
+                    continue
+                try:
+                    entry = orjson.loads(line)
+                except Exception:
+                    continue
+                strike = _strike_from_entry(entry)
+                if strike is not None:
+                    _tail_state["buffer"].append(strike)
     except Exception:
-        logger.exception("Failed to parse collector JSON")
-        return []
-
-    strikes = []
-    for entry in data[-limit:]:
-        parsed = entry.get("decoded") or {}
-        candidate = None
-        if parsed.get("success"):
-            rawp = parsed.get("raw") or {}
-            decp = parsed.get("decoded") or {}
-            for container in (rawp, decp):
-                if isinstance(container, dict):
-                    if "data" in container and isinstance(container["data"], dict):
-                        maybe = container["data"]
-                        if "lat" in maybe and "lon" in maybe:
-                            candidate = maybe
-                            break
-                    if "lat" in container and "lon" in container:
-                        candidate = container
-                        break
-        if candidate is None:
-            rm = entry.get("raw_message", "")
-            try:
-                pm = json.loads(rm)
-                if isinstance(pm, dict):
-                    if "data" in pm and isinstance(pm["data"], dict) and "lat" in pm["data"]:
-                        candidate = pm["data"]
-                    elif "lat" in pm and "lon" in pm:
-                        candidate = pm
-            except Exception:
-                pass
-        if candidate and "lat" in candidate and "lon" in candidate:
-            try:
-                strikes.append({
-                    "lat": float(candidate["lat"]),
-                    "lon": float(candidate["lon"]),
-                    "intensity": float(candidate.get("mcg", candidate.get("intensity", 1)))
-                })
-            except Exception:
-                continue
-    return strikes
+        logger.exception("Failed to tail collector JSON")
+        return _empty_strikes()
+
+    window = list(_tail_state["buffer"])[-limit:]
+    if not window:
+        return _empty_strikes()
+    lats, lons, intensities = zip(*window)
+    return _make_strikes(lats, lons, intensities)
 
 
 # ---------------------------
 # Flask endpoints
 # ---------------------------
-@app.route("/api/lightning")
-def api_lightning():
+def _strike_dict(strikes, i):
+    return {
+        "lat": float(strikes["lat"][i]),
+        "lon": float(strikes["lon"][i]),
+        "intensity": float(strikes["intensity"][i]),
+    }
+
+
+def _compute_payload():
     strikes = read_strikes_from_collector()
     alg = CMPSC463Algorithms()
-    bfs_clusters = alg.bfs_connected_components(strikes)
-    hotspots = alg.greedy_hotspot_selection(strikes)
-    mst_clusters = alg.prim_mst_clusters(strikes)
-
-    return jsonify({
-        "strikes": strikes,
-        "clusters": mst_clusters,
-        "hotspots": hotspots,
+    # One shared neighbor structure feeds BFS, density and MST
+    nbhd = alg._build_neighborhood(strikes)
+    bfs_clusters = alg.bfs_connected_components(strikes, nbhd=nbhd)
+    hotspots = alg.greedy_hotspot_selection(strikes, nbhd=nbhd)
+    mst_clusters = alg.kruskal_mst_clusters(strikes, nbhd=nbhd)
+
+    # Materialize JSON-friendly dicts only at the response boundary
+    strike_dicts = [_strike_dict(strikes, i) for i in range(strikes["n"])]
+    return {
+        "strikes": strike_dicts,
+        "clusters": [
+            {
+                "center": c["center"],
+                "count": c["count"],
+                "strikes": [strike_dicts[i] for i in c["members"]],
+            }
+            for c in mst_clusters
+        ],
+        "hotspots": [strike_dicts[i] for i in hotspots],
         "stats": {
-            "total_strikes": len(strikes),
+            "total_strikes": strikes["n"],
             "bfs_clusters": len(bfs_clusters),
             "mst_clusters": len(mst_clusters)
         }
-    })
+    }
+
+
+# Short-TTL memo of the encoded response: the collector only appends every
+# few seconds, so a burst of clients shares one clustering computation.
+RESPONSE_TTL_SECONDS = 2.0
+_response_cache = {"key": None, "body": None, "etag": None, "ts": 0.0}
+_compute_lock = threading.Lock()
+
+
+def _encode_payload():
+    body = orjson.dumps(_compute_payload(), option=orjson.OPT_SERIALIZE_NUMPY)
+    return body, hashlib.blake2b(body).hexdigest()[:16]
+
+
+# Precomputed response snapshot, refreshed off the request path by a watcher
+# thread whenever the collector file changes. Reference assignment is atomic
+# in CPython, so request handlers read it with a single deref, no lock.
+_snapshot = None  # {'body': bytes, 'etag': str}
+_snapshot_thread = None
+
+
+def _snapshot_watcher(poll_seconds=0.5):
+    global _snapshot
+    last_key = None
+    while True:
+        try:
+            try:
+                stat = COLLECTOR_JSON.stat()
+                key = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                key = None
+            if key != last_key or _snapshot is None:
+                with _compute_lock:
+                    body, etag = _encode_payload()
+                _snapshot = {"body": body, "etag": etag}
+                last_key = key
+        except Exception:
+            logger.exception("Snapshot refresh failed")
+        time.sleep(poll_seconds)
+
+
+def start_snapshot_watcher():
+    global _snapshot_thread
+    if _snapshot_thread is None or not _snapshot_thread.is_alive():
+        _snapshot_thread = threading.Thread(target=_snapshot_watcher, daemon=True)
+        _snapshot_thread.start()
+    return _snapshot_thread
+
+
+@app.route("/api/lightning")
+def api_lightning():
+    snap = _snapshot
+    if snap is not None:
+        etag = snap["etag"]
+        body = snap["body"]
+    else:
+        # no watcher running yet (e.g. gunicorn worker): compute on demand
+        # behind the short TTL memo
+        try:
+            stat = COLLECTOR_JSON.stat()
+            key = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            key = None
+        now = time.monotonic()
+        if (key is None or key != _response_cache["key"]
+                or now - _response_cache["ts"] >= RESPONSE_TTL_SECONDS):
+            with _compute_lock:
+                body, etag = _encode_payload()
+            _response_cache["key"] = key
+            _response_cache["body"] = body
+            _response_cache["etag"] = etag
+            _response_cache["ts"] = now
+        etag = _response_cache["etag"]
+        body = _response_cache["body"]
+    if request.headers.get("If-None-Match") == etag:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype="application/json")
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"max-age={int(RESPONSE_TTL_SECONDS)}"
+    return response
+
+
+def _scan_frontend_build():
+    """Walk FRONTEND_BUILD once into a set of relative paths.
+
+    The static hot path then checks set membership in O(1) instead of
+    paying a stat() syscall per existence probe on every request. Rebuilt
+    on startup (and on SIGHUP) rather than per request.
+    """
+    files = set()
+    if FRONTEND_BUILD.is_dir():
+        for p in FRONTEND_BUILD.rglob("*"):
+            if p.is_file():
+                files.add(p.relative_to(FRONTEND_BUILD).as_posix())
+    return files
+
+
+_built_files = _scan_frontend_build()
+
+
+def _rescan_frontend_build():
+    global _built_files
+    _built_files = _scan_frontend_build()
 
 
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
 def serve_frontend(path):
-    # If build directory exists, serve files from build (create-react-app output)
-    if FRONTEND_BUILD.exists():
-        if path and (FRONTEND_BUILD / path).exists():
+    # If the build manifest is populated, serve from build (create-react-app output)
+    if _built_files:
+        if path and path in _built_files:
             return send_from_directory(str(FRONTEND_BUILD), path)
         # serve index.html for SPA
-        if (FRONTEND_BUILD / "index.html").exists():
+        if "index.html" in _built_files:
             return send_from_directory(str(FRONTEND_BUILD), "index.html")
-    # Fallback: try public (dev/static files)
+    # Fallback: try public (dev/static files; not the hot path)
     if FRONTEND_PUBLIC.exists():
         if path and (FRONTEND_PUBLIC / path).exists():
             return send_from_directory(str(FRONTEND_PUBLIC), path)
@@ -362,48 +621,83 @@ def serve_frontend(path):
 # ---------------------------
 # Shutdown helpers
 # ---------------------------
-def shutdown_handler(signum, frame):
-    logger.info(f"Received signal {signum}; shutting down...")
-    shutdown_event.set()
-    # Terminate collector subprocess if running
-    with collector_proc_lock:
-        global collector_proc
-        if collector_proc and collector_proc.poll() is None:
+def stop_collector_supervisor():
+    """Terminate the supervisor process; it shuts the collector down itself."""
+    if supervisor_proc and supervisor_proc.poll() is None:
+        logger.info("Terminating collector supervisor...")
+        try:
+            supervisor_proc.terminate()
+            supervisor_proc.wait(timeout=10)
+        except Exception:
             try:
-                collector_proc.terminate()
+                supervisor_proc.kill()
             except Exception:
                 pass
 
 
-signal.signal(signal.SIGINT, shutdown_handler)
-signal.signal(signal.SIGTERM, shutdown_handler)
+def shutdown_handler(signum, frame):
+    logger.info(f"Received signal {signum}; shutting down...")
+    stop_collector_supervisor()
+
+
+def _install_signal_handlers():
+    """Install the orchestrator's signal handlers (called from main() only).
+
+    Registering at module scope would also run inside gunicorn workers,
+    where app:app is imported after the worker sets up its own handlers —
+    clobbering them with a no-op and breaking graceful shutdown.
+    """
+    signal.signal(signal.SIGINT, shutdown_handler)
+    signal.signal(signal.SIGTERM, shutdown_handler)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda signum, frame: _rescan_frontend_build())
 
 
 # ---------------------------
 # Main orchestration
 # ---------------------------
 def main():
+    _install_signal_handlers()
+
     # 1) Ensure frontend build exists (unless SKIP_FRONTEND_BUILD=1)
     built = ensure_frontend_built()
     if not built:
         logger.warning("Frontend build not available. The server may return an error page.")
+    # pick up anything ensure_frontend_built just produced
+    _rescan_frontend_build()
 
-    # 2) Start collector supervisor thread
-    sup_thread = start_collector_supervisor()
+    # 2) Start collector supervisor process
+    start_collector_supervisor()
 
-    # 3) Start Flask
+    # 3) Start the HTTP server
     host = os.getenv("LIGHTNING_HOST", "0.0.0.0")
     port = int(os.getenv("LIGHTNING_PORT", "8080"))
     debug = os.getenv("FLASK_DEBUG", "0").lower() in ("1", "true", "yes")
-    logger.info(f"Starting Flask server on {host}:{port} (debug={debug})")
+    use_gunicorn = os.getenv("LIGHTNING_USE_GUNICORN", "0").lower() in ("1", "true", "yes")
     try:
+        if use_gunicorn:
+            # Production mode: a gunicorn worker pool serves requests so a
+            # CPU-heavy clustering request doesn't stall other clients. The
+            # collector supervisor stays in this orchestrator process only —
+            # workers just import the module and never run main().
+            gunicorn = shutil.which("gunicorn")
+            if gunicorn:
+                workers = os.getenv("LIGHTNING_WORKERS", "4")
+                logger.info(f"Starting gunicorn ({workers} workers) on {host}:{port}")
+                server = subprocess.Popen(
+                    [gunicorn, "-w", workers, "-b", f"{host}:{port}", "app:app"],
+                    cwd=str(Path(__file__).resolve().parent),
+                )
+                server.wait()
+                return
+            logger.error("LIGHTNING_USE_GUNICORN set but gunicorn not found; falling back to the dev server.")
+        # Precompute responses off the request path while the dev server runs
+        start_snapshot_watcher()
+        logger.info(f"Starting Flask dev server on {host}:{port} (debug={debug})")
         # Use Werkzeug's reloader disabled to avoid double-launching subprocesses
         app.run(host=host, port=port, debug=debug, use_reloader=False)
     finally:
-        # shutdown_event ensures supervisor will exit and terminate collector
-        shutdown_event.set()
-        logger.info("Waiting for supervisor thread to finish...")
-        sup_thread.join(timeout=5)
+        stop_collector_supervisor()
         logger.info("Exiting orchestrator.")
 
 
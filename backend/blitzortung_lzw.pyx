@@ -0,0 +1,44 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled Blitzortung LZW-style string decoder.
+
+Optional drop-in for the pure-Python decoder in blitzortung_parser.py —
+build it in place with:
+
+    pip install cython && python setup_lzw.py build_ext --inplace
+
+The per-character work (ord, dict lookup, string append) dominates the
+pure-Python loop; here the loop, code arithmetic and table indexing are
+compiled, and the dictionary is a flat list indexed by code - 256 instead
+of a hashed dict.
+"""
+
+
+cpdef str decode(str encoded):
+    if not encoded:
+        return ""
+
+    cdef Py_ssize_t i, n = len(encoded)
+    cdef Py_ssize_t table_size = 0
+    cdef int code
+
+    prev = encoded[0]
+    head = prev
+    out = [prev]
+    table = []
+
+    for i in range(1, n):
+        code = ord(encoded[i])
+        if code < 256:
+            entry = encoded[i]
+        elif code - 256 < table_size:
+            entry = table[code - 256]
+        else:
+            # LZW "special case": code not yet defined
+            entry = prev + head
+        out.append(entry)
+        head = entry[0]
+        table.append(prev + head)
+        table_size += 1
+        prev = entry
+
+    return "".join(out)
@@ -1,61 +1,100 @@
+import array
 import asyncio
+import functools
 import json
+import os
+import queue
+import sys
+import threading
+import time
 import zlib
-import struct
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import orjson
 from playwright.async_api import async_playwright
 
+try:
+    # libdeflate bindings: noticeably faster one-shot inflate than zlib
+    import deflate
+except ImportError:
+    deflate = None
 
-# ---------------------------
-# ZLIB DECOMPRESSION FUNCTION
-# ---------------------------
-def decompress_ws(data: bytes) -> str:
-    try:
-        return zlib.decompress(data, -zlib.MAX_WBITS).decode("utf-8", errors="replace")
-    except Exception as e:
-        print("[DECOMPRESS ERROR]", e)
-        return None
+
+# permessage-deflate strips this trailer from every message before it is
+# sent; the receiver has to append it back before inflating
+_DEFLATE_TAIL = b"\x00\x00\xff\xff"
 
 
 # -------------------------------------------
 # BLITZORTUNG CUSTOM LZW-STYLE STRING DECODER
 # -------------------------------------------
-def blitzortung_lzw_decode(encoded: str) -> str:
-    if not encoded:
-        return ""
+try:
+    # compiled decoder (see setup_lzw.py); per-char dispatch happens in C
+    import blitzortung_lzw as _lzw_c
+except ImportError:
+    _lzw_c = None
 
-    # Dictionary: int code -> string
-    dictionary: dict[int, str] = {}
 
-    chars = list(encoded)
+def blitzortung_lzw_decode(encoded: str) -> str:
+    if _lzw_c is not None:
+        return _lzw_c.decode(encoded)
+    return _blitzortung_lzw_decode_py(encoded)
 
-    # First char is literal; seed output & previous value
-    prev = chars[0]
-    out = [prev]
 
-    next_code = 256
-    head = prev  # first char of previous decoded string
+def _blitzortung_lzw_decode_py(encoded: str) -> str:
+    if not encoded:
+        return ""
 
-    for ch in chars[1:]:
+    # The output is a flat list of characters and the dictionary never
+    # materializes a string: entry code-256 is a (start, length) window
+    # into that output. This works because every new entry is "previous
+    # entry + first char of current entry", and the current entry is
+    # appended directly after the previous one — so the new entry is
+    # exactly the contiguous run of length prev_len + 1 at prev_start.
+    # Typed int arrays keep the table at two machine ints per entry.
+    out = [encoded[0]]
+    prev_start = 0
+    prev_len = 1
+
+    starts = array.array("i")
+    lengths = array.array("i")
+    # local aliases skip the bound-method lookup per character
+    starts_append = starts.append
+    lengths_append = lengths.append
+    out_append = out.append
+    out_extend = out.extend
+    size = 0
+
+    it = iter(encoded)  # iterate the string directly; no list() copy
+    next(it)
+    for ch in it:
         code = ord(ch)
+        entry_start = len(out)
 
         # Literal characters
         if code < 256:
-            entry = ch
+            out_append(ch)
+            entry_len = 1
         else:
-            # LZW "special case": if code not yet defined, use prev + head
-            entry = dictionary.get(code, prev + head)
-
-        out.append(entry)
-
-        # First character of current entry
-        head = entry[0]
+            idx = code - 256
+            if idx < size:
+                s = starts[idx]
+                entry_len = lengths[idx]
+                out_extend(out[s:s + entry_len])
+            else:
+                # LZW "special case": code not yet defined → prev + prev[0]
+                out_extend(out[prev_start:prev_start + prev_len])
+                out_append(out[prev_start])
+                entry_len = prev_len + 1
 
-        # Add new entry to dictionary: previous_string + first_char_of_current
-        dictionary[next_code] = prev + head
-        next_code += 1
+        # Add new entry: previous_string + first_char_of_current, i.e.
+        # the window starting at prev_start extended by one character
+        starts_append(prev_start)
+        lengths_append(prev_len + 1)
+        size += 1
 
-        prev = entry
+        prev_start = entry_start
+        prev_len = entry_len
 
     return "".join(out)
 
@@ -67,19 +106,19 @@ def decode_binary_value(value):
     if not isinstance(value, str):
         return value
 
-    # Check if string contains high-byte characters (indicating binary encoding)
-    if not any(ord(c) > 127 for c in value):
+    # Only strings with high-byte characters can be binary-encoded;
+    # str.isascii() is a flat C check, no per-character Python loop
+    if value.isascii():
         return value
 
     try:
         # Interpret as bytes 1:1
         byte_data = value.encode("latin-1")  # Preserve byte values exactly
 
-        # Attempt to decode as various numeric types
-        if len(byte_data) == 2:
-            return struct.unpack(">H", byte_data)[0]  # 16-bit unsigned
-        elif len(byte_data) == 4:
-            return struct.unpack(">I", byte_data)[0]  # 32-bit unsigned
+        # Attempt to decode as various numeric types (big-endian unsigned;
+        # int.from_bytes skips struct's format-string parsing and tuple)
+        if len(byte_data) in (2, 4):
+            return int.from_bytes(byte_data, "big")
 
         # If we can't decode, return as hex string for inspection
         return byte_data.hex()
@@ -88,49 +127,97 @@ def decode_binary_value(value):
 
 
 def clean_lightning_data(data):
-    if isinstance(data, dict):
-        cleaned = {}
-        for key, value in data.items():
-            cleaned[key] = clean_lightning_data(value)
-        return cleaned
-
-    elif isinstance(data, list):
-        return [clean_lightning_data(item) for item in data]
+    """Decode binary-packed string values throughout a parsed message.
 
-    elif isinstance(data, str):
+    Works in place with an explicit stack: no recursion limit to worry
+    about on deep frames, and no parallel copy of the whole tree.
+    """
+    if isinstance(data, str):
         return decode_binary_value(data)
-
-    else:
+    if not isinstance(data, (dict, list)):
         return data
 
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for key, value in items:
+            if isinstance(value, str):
+                node[key] = decode_binary_value(value)
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+    return data
+
 
 # -------------------------------
 # MAIN PARSER / ENCODING DETECTOR
 # -------------------------------
-def parse_lightning_message(message_str: str) -> dict:
-    # 1) First attempt: plain JSON (no obfuscation)
+def _as_text(payload) -> str:
+    if isinstance(payload, bytes):
+        return payload.decode("utf-8", errors="replace")
+    return payload
+
+
+ENCODING_LZW = "blitzortung_lzw_string_obfuscation"
+
+
+def _parse_plain(payload) -> dict:
+    raw_data = orjson.loads(payload)
+    # an all-ASCII payload cannot hold binary-packed values, so the tree
+    # walk is skipped entirely; cleaning mutates raw_data in place (the
+    # untouched original text is still logged as raw_message)
+    if not payload.isascii():
+        clean_lightning_data(raw_data)
+    return {
+        "success": True,
+        "raw": raw_data,
+        "decoded": raw_data,
+        "encoding": "plain_json",
+    }
+
+
+def _parse_lzw(payload) -> dict:
+    decoded_str = blitzortung_lzw_decode(_as_text(payload))
+    raw_data = orjson.loads(decoded_str)
+    # an all-ASCII payload cannot hold binary-packed values, so the tree
+    # walk is skipped entirely; cleaning mutates raw_data in place (the
+    # untouched original text is still logged as raw_message)
+    if not decoded_str.isascii():
+        clean_lightning_data(raw_data)
+    return {
+        "success": True,
+        "raw": raw_data,
+        "decoded": raw_data,
+        # This is the "what kind of encryption is this?" label:
+        "encoding": ENCODING_LZW,
+    }
+
+
+def parse_lightning_message(payload) -> dict:
+    """Parse one WebSocket payload (bytes straight from decompression, or str).
+
+    A JSON text must begin with an ASCII token, so a first codepoint above
+    255 proves the payload cannot be plain JSON and routes it straight to
+    the LZW decoder — the one reordering that provably cannot change the
+    detector's verdict. Everything else goes plain-first: any broader
+    sniffing would need a validating plain parse anyway (the LZW decoder
+    maps some valid text frames to different-but-valid JSON), which costs
+    exactly what it saves.
+    """
+    if isinstance(payload, str) and payload and ord(payload[0]) > 255:
+        try:
+            return _parse_lzw(payload)
+        except Exception:
+            pass  # fall through for the detector's combined error message
+
+    # 1) First attempt: plain JSON (no obfuscation); orjson parses bytes in C
     try:
-        raw_data = json.loads(message_str)
-        cleaned_data = clean_lightning_data(raw_data)
-        return {
-            "success": True,
-            "raw": raw_data,
-            "decoded": cleaned_data,
-            "encoding": "plain_json",
-        }
-    except json.JSONDecodeError as first_error:
+        return _parse_plain(payload)
+    except orjson.JSONDecodeError as first_error:
         # 2) Second attempt: assume Blitzortung LZW-style obfuscation
+        # (the LZW decoder works on codepoints, so decode to str only here)
         try:
-            decoded_str = blitzortung_lzw_decode(message_str)
-            raw_data = json.loads(decoded_str)
-            cleaned_data = clean_lightning_data(raw_data)
-            return {
-                "success": True,
-                "raw": raw_data,
-                "decoded": cleaned_data,
-                # This is the "what kind of encryption is this?" label:
-                "encoding": "blitzortung_lzw_string_obfuscation",
-            }
+            return _parse_lzw(payload)
         except Exception as second_error:
             # Could not decode even after LZW attempt
             return {
@@ -139,7 +226,7 @@ def parse_lightning_message(message_str: str) -> dict:
                     "JSON Parse Error. Direct parse failed with: "
                     f"{first_error}; LZW-style decode failed with: {second_error}"
                 ),
-                "raw_message": message_str[:200],
+                "raw_message": _as_text(payload[:200]),
             }
 
     except Exception as e:
@@ -147,15 +234,48 @@ def parse_lightning_message(message_str: str) -> dict:
         return {
             "success": False,
             "error": f"Unknown Error: {e}",
-            "raw_message": message_str[:200],
+            "raw_message": _as_text(payload[:200]),
         }
 
 
+# Station-status messages are often retransmitted verbatim within short
+# windows; a small per-worker LRU keyed on the payload itself returns the
+# parsed object without re-running LZW/JSON on those duplicates.
+@functools.lru_cache(maxsize=1024)
+def _parse_cached(payload):
+    return parse_lightning_message(payload)
+
+
+def _parse_entry_line(index, payload, ts_ns):
+    """Parse, clean and serialize one log entry (runs in a worker process)."""
+    parsed_result = _parse_cached(payload)
+    entry = {
+        "index": index,
+        # integer epoch nanoseconds: one clock_gettime at receive time, no
+        # datetime object or strftime-style formatting per message
+        "ts_ns": ts_ns,
+        "raw_message": _as_text(payload),
+        "decoded": parsed_result,
+    }
+    try:
+        line = orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+    except orjson.JSONEncodeError:
+        # e.g. lone surrogates in a mangled raw_message; stdlib escapes them
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+    return line, parsed_result["success"], parsed_result.get("encoding")
+
+
 # ---------------
 # COLLECTOR CLASS
 # ---------------
+# writer batching: flush a batch once it holds this many lines or once the
+# oldest line in it is this old, whichever happens first
+_WRITE_MAX_LINES = 64
+_WRITE_MAX_DELAY = 0.05  # seconds
+
+
 class BlitzortungRawCollector:
-    def __init__(self, json_filename="lightning_messages_decoded.json"):
+    def __init__(self, json_filename="lightning_messages.jsonl"):
         self.json_filename = json_filename
         self.message_count = 0
         self.decode_stats = {
@@ -164,16 +284,134 @@ class BlitzortungRawCollector:
             "decode_failed": 0,
         }
 
-        with open(self.json_filename, "w", encoding="utf-8") as f:
-            f.write("[\n")
+        # Persistent raw-deflate decompressor: with context takeover the
+        # server reuses its compression window across messages, so one
+        # decompressobj must live for the whole connection. This also skips
+        # re-allocating zlib state on every frame.
+        self._inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+
+        # libdeflate can only handle complete standalone streams, so it is
+        # tried first and disabled for the connection on its first failure
+        # (e.g. context takeover) rather than raising on every frame
+        self._use_libdeflate = deflate is not None
+
+        # newline-delimited JSON: one compact object per line, streamable
+        # by readers without any closing-bracket bookkeeping. One handle
+        # for the whole run with a 1 MiB buffer, so per-message saves are
+        # memcpy-into-buffer instead of open/write/close syscall triples.
+        self._fh = open(self.json_filename, "wb", buffering=1 << 20)
+
+        # Parsing (LZW + JSON + clean) is CPU-bound and stateless, so it
+        # runs on a process pool; decompression stays inline because the
+        # shared inflater window forces sequential frame order. A single
+        # writer thread owns the file so the event loop never blocks on I/O.
+        self._cpu_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        self._write_q = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
 
         print(f"Created output file: {self.json_filename}\n")
 
+    def _writer_loop(self):
+        # Collect lines into a batch and land each batch with a single
+        # write + flush, so the per-strike syscall cost disappears while
+        # the tailing API still sees data within _WRITE_MAX_DELAY.
+        pending = []
+        batch_start = 0.0
+        shutting_down = False
+        while not shutting_down:
+            if pending:
+                timeout = max(0.0, _WRITE_MAX_DELAY - (time.monotonic() - batch_start))
+            else:
+                timeout = None  # idle: block until the next line arrives
+            try:
+                line = self._write_q.get(timeout=timeout)
+            except queue.Empty:
+                line = b""  # batch aged out; write what we have
+
+            if line is None:
+                shutting_down = True
+            elif line:
+                if not pending:
+                    batch_start = time.monotonic()
+                pending.append(line)
+                if (
+                    len(pending) < _WRITE_MAX_LINES
+                    and time.monotonic() - batch_start < _WRITE_MAX_DELAY
+                ):
+                    continue
+
+            if pending:
+                self._fh.write(b"".join(pending))
+                self._fh.flush()
+                pending.clear()
+
+    def _on_parsed(self, fut):
+        try:
+            line, success, encoding = fut.result()
+        except Exception as e:
+            print(f"[ERROR] Failed to parse message: {e}")
+            self.decode_stats["decode_failed"] += 1
+            return
+
+        if success:
+            self.decode_stats["decoded_success"] += 1
+        else:
+            self.decode_stats["decode_failed"] += 1
+
+        self._write_q.put(line)
+
+        # Progress reporting
+        done = self.decode_stats["decoded_success"] + self.decode_stats["decode_failed"]
+        if done % 10 == 0 or done <= 5:
+            enc = encoding if success else "failed"
+            print(
+                f"Saved message #{done} | "
+                f"Decoded: {self.decode_stats['decoded_success']} | "
+                f"Failed: {self.decode_stats['decode_failed']} | "
+                f"Encoding: {enc}"
+            )
+
+    def decompress_ws(self, data: bytes) -> bytes:
+        # stays bytes end-to-end: orjson parses bytes directly, so decoding
+        # to str here would just add a full extra pass over every payload
+        if self._use_libdeflate:
+            # An undersized output bound raises the same way a
+            # context-takeover stream does, so retry once with a bound no
+            # realistic frame can exceed before writing libdeflate off —
+            # repetitive station-list JSON routinely beats 16:1.
+            for bound in (len(data) * 16 + 256, len(data) * 1024 + (1 << 16)):
+                try:
+                    return deflate.deflate_decompress(data, bound)
+                except Exception:
+                    pass
+            self._use_libdeflate = False
+        try:
+            out = self._inflater.decompress(data + _DEFLATE_TAIL)
+            if self._inflater.eof:
+                # Standalone frame: the stream just ended (BFINAL set), and
+                # a finished decompressobj silently returns b'' for all
+                # further input — no zlib.error — so reset it here. If this
+                # frame itself hit an already-finished inflater, retry it.
+                self._inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+                if not out and data:
+                    out = zlib.decompress(data, -zlib.MAX_WBITS)
+            return out
+        except zlib.error:
+            # Window desynced (dropped frame?) or the frames are standalone
+            # deflate streams: reset and retry the message one-shot.
+            self._inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+            try:
+                return zlib.decompress(data, -zlib.MAX_WBITS)
+            except Exception as e:
+                print("[DECOMPRESS ERROR]", e)
+                return None
+
     def save_message(self, message):
         """Save and decode WebSocket message"""
         try:
             raw_bytes = None
-            message_str = ""
+            payload = ""
 
             # Extract bytes/text from Playwright's WS frame structure
             if isinstance(message, dict):
@@ -184,7 +422,7 @@ class BlitzortungRawCollector:
                 # Text frame (opcode 1)
                 if "opcode" in message and message["opcode"] == 1:
                     msg_text = message.get("data", "")
-                    message_str = str(msg_text)
+                    payload = str(msg_text)
 
                 # Alternative field seen in some runtimes
                 if "payloadData" in message:
@@ -192,64 +430,44 @@ class BlitzortungRawCollector:
                     if isinstance(possible, bytes):
                         raw_bytes = possible
                     elif isinstance(possible, str):
-                        message_str = possible
+                        payload = possible
 
-            # Decompress if we have bytes (zlib / permessage-deflate)
+            # Decompress if we have bytes (zlib / permessage-deflate);
+            # the result stays bytes all the way into the parser
             if raw_bytes is not None:
-                message_str = decompress_ws(raw_bytes)
-                if message_str is None:
+                payload = self.decompress_ws(raw_bytes)
+                if payload is None:
                     return
 
             elif isinstance(message, str):
-                message_str = message
-            else:
+                payload = message
+            elif not payload:
                 # Fallback string conversion
-                message_str = str(message)
+                payload = str(message)
 
-            # Parse and decode the message
+            # Hand parse + serialize to the pool; the completion callback
+            # updates stats and enqueues the line for the writer thread
             self.decode_stats["total"] += 1
-            parsed_result = parse_lightning_message(message_str)
-
-            if parsed_result["success"]:
-                self.decode_stats["decoded_success"] += 1
-            else:
-                self.decode_stats["decode_failed"] += 1
-
-            # Create entry with both raw and decoded data
-            entry = {
-                "index": self.message_count,
-                "timestamp": datetime.now().isoformat(),
-                "raw_message": message_str,
-                "decoded": parsed_result,
-            }
-
-            # Write to file
-            with open(self.json_filename, "a", encoding="utf-8") as f:
-                if self.message_count > 0:
-                    f.write(",\n")
-                json.dump(entry, f, ensure_ascii=False, indent=2)
-
+            fut = self._cpu_pool.submit(
+                _parse_entry_line,
+                self.message_count,
+                payload,
+                time.time_ns(),
+            )
+            fut.add_done_callback(self._on_parsed)
             self.message_count += 1
 
-            # Progress reporting
-            if self.message_count % 10 == 0 or self.message_count <= 5:
-                enc = parsed_result.get("encoding", "n/a") if parsed_result.get("success") else "failed"
-                print(
-                    f"Saved message #{self.message_count} | "
-                    f"Decoded: {self.decode_stats['decoded_success']} | "
-                    f"Failed: {self.decode_stats['decode_failed']} | "
-                    f"Encoding: {enc}"
-                )
-
         except Exception as e:
             print(f"[ERROR] Failed to save message: {e}")
 
     def finalize_file(self):
-        """Finalize the output JSON file"""
+        """Drain the pipeline, close the output handle and print statistics"""
         try:
-            with open(self.json_filename, "a", encoding="utf-8") as f:
-                f.write("\n]")
-
+            self._cpu_pool.shutdown(wait=True)  # let in-flight parses finish
+            self._write_q.put(None)
+            self._writer.join()
+            if not self._fh.closed:
+                self._fh.close()
             print(f"\n{'=' * 70}")
             print(f"Finalized file with {self.message_count} entries.")
             print("Decode Statistics:")
@@ -322,10 +540,35 @@ class BlitzortungRawCollector:
 # ----------------
 async def main():
     collector = BlitzortungRawCollector(
-        json_filename="lightning_messages_decoded.json"
+        json_filename="lightning_messages.jsonl"
     )
     await collector.collect_from_browser(duration_seconds=120)
 
 
+def _run_profiled():
+    """Run a collection under cProfile (python blitzortung_parser.py --profile).
+
+    Profiles the main process only — the event loop, decompression and
+    pipeline dispatch; parse workers run in their own processes. Use the
+    printed summary to check where the time actually goes before reaching
+    for further optimizations.
+    """
+    import cProfile
+    import pstats
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        asyncio.run(main())
+    finally:
+        profile.disable()
+        profile.dump_stats("collector_profile.prof")
+        pstats.Stats(profile).sort_stats("cumulative").print_stats(25)
+        print("Full profile written to collector_profile.prof")
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    if "--profile" in sys.argv:
+        _run_profiled()
+    else:
+        asyncio.run(main())
@@ -0,0 +1,69 @@
+"""Numba-compiled haversine kernels for the clustering hot path.
+
+Optional accelerator: importing this module requires numba. app.py falls
+back to the BallTree path when the import fails. The kernels never
+materialize the (n, n) distance matrix — they emit a CSR neighbor list /
+per-point counts directly, so there is no n^2 allocation.
+
+Radius checks compare the haversine "a" term against sin(r / 2R)^2
+instead of computing arcsin/sqrt per pair.
+"""
+import math
+
+import numpy as np
+from numba import njit, prange
+
+EARTH_RADIUS_KM = 6371.0
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def density_counts(lat_r, lon_r, radius_km):
+    """Neighbor counts within radius_km for each point (lat/lon in radians)."""
+    n = lat_r.shape[0]
+    a_thresh = math.sin(radius_km / (2.0 * EARTH_RADIUS_KM)) ** 2
+    counts = np.zeros(n, dtype=np.int64)
+    for i in prange(n):
+        cos_i = math.cos(lat_r[i])
+        c = 0
+        for j in range(n):
+            dlat = lat_r[j] - lat_r[i]
+            dlon = lon_r[j] - lon_r[i]
+            a = math.sin(dlat / 2.0) ** 2 + cos_i * math.cos(lat_r[j]) * math.sin(dlon / 2.0) ** 2
+            if a <= a_thresh:
+                c += 1
+        counts[i] = c
+    return counts
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def haversine_neighbors(lat_r, lon_r, radius_km):
+    """CSR adjacency (indptr, indices) of all pairs within radius_km.
+
+    Counting pass first, then a fill pass, so the output is exactly sized
+    with no intermediate per-row lists.
+    """
+    n = lat_r.shape[0]
+    a_thresh = math.sin(radius_km / (2.0 * EARTH_RADIUS_KM)) ** 2
+    counts = density_counts(lat_r, lon_r, radius_km)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    for i in range(n):
+        indptr[i + 1] = indptr[i] + counts[i]
+    indices = np.empty(indptr[n], dtype=np.int64)
+    for i in prange(n):
+        cos_i = math.cos(lat_r[i])
+        pos = indptr[i]
+        for j in range(n):
+            dlat = lat_r[j] - lat_r[i]
+            dlon = lon_r[j] - lon_r[i]
+            a = math.sin(dlat / 2.0) ** 2 + cos_i * math.cos(lat_r[j]) * math.sin(dlon / 2.0) ** 2
+            if a <= a_thresh:
+                indices[pos] = j
+                pos += 1
+    return indptr, indices
+
+
+# Warm up the JIT once at import so the first API request doesn't pay
+# compilation latency.
+_warm = np.radians(np.array([0.0, 0.5]))
+haversine_neighbors(_warm, _warm, 50.0)
+del _warm
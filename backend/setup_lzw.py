@@ -0,0 +1,15 @@
+"""Build the optional compiled LZW decoder in place:
+
+    pip install cython
+    python setup_lzw.py build_ext --inplace
+
+blitzortung_parser.py picks the extension up automatically when present
+and falls back to the pure-Python decoder otherwise.
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="blitzortung_lzw",
+    ext_modules=cythonize("blitzortung_lzw.pyx"),
+)
@@ -0,0 +1,89 @@
+import os
+import sys
+import signal
+import logging
+import subprocess
+import time
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("lightning-supervisor")
+
+BACKEND_DIR = Path(__file__).resolve().parent
+COLLECTOR_SCRIPT = BACKEND_DIR / "blitzortung_parser.py"
+
+# Runs as its own OS process (spawned by app.py) so the restart loop and
+# the blocking stdout tailing never contend for the web server's GIL.
+
+shutdown = False
+collector_proc = None  # subprocess.Popen
+
+
+def _handle_signal(signum, frame):
+    global shutdown
+    logger.info(f"Supervisor received signal {signum}; shutting down...")
+    shutdown = True
+    if collector_proc and collector_proc.poll() is None:
+        try:
+            collector_proc.terminate()
+        except Exception:
+            pass
+
+
+def main():
+    global collector_proc
+    signal.signal(signal.SIGINT, _handle_signal)
+    signal.signal(signal.SIGTERM, _handle_signal)
+
+    env = os.environ.copy()
+    # Pass headless env variable into collector
+    env["PLAYWRIGHT_HEADLESS"] = os.getenv("PLAYWRIGHT_HEADLESS", "1")
+    cmd = [sys.executable, COLLECTOR_SCRIPT.name]
+
+    while not shutdown:
+        logger.info("Starting collector subprocess...")
+        try:
+            # Run collector with cwd=BACKEND_DIR so its output file will be created there
+            collector_proc = subprocess.Popen(
+                cmd,
+                cwd=str(BACKEND_DIR),
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+            logger.info(f"Collector started (pid={collector_proc.pid})")
+        except Exception:
+            logger.exception("Failed to start collector:")
+            collector_proc = None
+
+        if collector_proc:
+            try:
+                for line in collector_proc.stdout:
+                    print(f"[collector] {line.rstrip()}")
+                    if shutdown:
+                        break
+            except Exception:
+                logger.exception("Error while monitoring collector stdout")
+            rc = collector_proc.wait()
+            logger.warning(f"Collector process exited (rc={rc})")
+
+        if not shutdown:
+            logger.info("Restarting collector in 2s...")
+            time.sleep(2)
+
+    if collector_proc and collector_proc.poll() is None:
+        logger.info("Terminating collector subprocess...")
+        collector_proc.terminate()
+        try:
+            collector_proc.wait(timeout=5)
+        except Exception:
+            try:
+                collector_proc.kill()
+            except Exception:
+                pass
+    logger.info("Collector supervisor exiting.")
+
+
+if __name__ == "__main__":
+    main()